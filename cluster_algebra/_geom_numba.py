@@ -0,0 +1,47 @@
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba is optional, fall back to plain python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+@njit(cache=True)
+def _segseg_intersect(x1: float, y1: float, x2: float, y2: float,
+                      x3: float, y3: float, x4: float, y4: float) -> Tuple[bool, float, float]:
+    """
+    Intersection of the segments (x1, y1)-(x2, y2) and (x3, y3)-(x4, y4).
+    Returns (found, x, y); x and y are meaningless when found is False.
+    """
+    den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if den == 0:
+        return False, 0.0, 0.0  # Lines are parallel
+    
+    t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / den
+    u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den
+    
+    if 0 <= t <= 1 and 0 <= u <= 1:
+        return True, x1 + t * (x2 - x1), y1 + t * (y2 - y1)
+    
+    return False, 0.0, 0.0
+
+
+@njit(cache=True)
+def _shear(ra: np.ndarray, rb: np.ndarray, rc: np.ndarray, rd: np.ndarray, bound: int) -> np.ndarray:
+    """
+    Shear coordinates of an arc with respect to the diagonals (a, b) of the quadrilaterals (a, b, c, d),
+    c on the left of a -> b. Vertices are given by relative position, those below bound lie on one side of the arc.
+    """
+    out = np.zeros(ra.shape[0], dtype=np.int8)
+    for i in range(ra.shape[0]):
+        sa, sb, sc, sd = ra[i] < bound, rb[i] < bound, rc[i] < bound, rd[i] < bound
+        if sa != sb and sc != sd:
+            out[i] = 1 if sc == sb else -1
+    return out
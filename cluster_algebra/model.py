@@ -1,28 +1,34 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ._geom_numba import HAS_NUMBA, _segseg_intersect, _shear
 
 Point2D = Tuple[float, float]
 
-class Vertex(BaseModel):
+@dataclass(slots=True, eq=False, repr=False)
+class Vertex:
     """
     A vertex in a graph.
     """
-    x: float = Field(..., description="X coordinate of the vertex")
-    y: float = Field(..., description="Y coordinate of the vertex")
-    id: int = Field(..., description="Unique identifier, ex: 0, 1, etc.")
-    name: str = Field(default=None, description="Name of the vertex, ex: 'v0', 'v1', etc.")
-    description: Optional[str] = Field(default=None, description="Description of the vertex")
-
-    def __init__(self, **data):
-        super().__init__(**data)
+    x: float  # X coordinate of the vertex
+    y: float  # Y coordinate of the vertex
+    id: int  # Unique identifier, ex: 0, 1, etc.
+    name: Optional[str] = None  # Name of the vertex, ex: 'v0', 'v1', etc.
+    description: Optional[str] = None  # Description of the vertex
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
         if self.name is None:
             self.name = f"v_{self.id}"
+        self._hash = hash(self.id)
     
     def __eq__(self, other) -> bool:
-        return self.id == other.id
+        return self is other or self.id == other.id
     
     def __hash__(self):
-        return hash(self.id)
+        return self._hash
     
     def __repr__(self):
         return self.name
@@ -34,18 +40,18 @@ class Vertex(BaseModel):
         return (self.x, self.y)
     
 
-class Edge(BaseModel):
+@dataclass(slots=True, eq=False, repr=False)
+class Edge:
     """
     An edge in a graph.
     """
-    v1: Vertex = Field(..., description="Source vertex of the edge")
-    v2: Vertex = Field(..., description="Target vertex of the edge")
-    id: int = Field(..., description="Unique identifier, ex: 0, 1, etc.")
-    name: str = Field(default=None, description="Name of the edge, ex: 'e_0', 'e_1', etc.")
-    description: Optional[str] = Field(default=None, description="Description of the edge")
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+    v1: Vertex  # Source vertex of the edge
+    v2: Vertex  # Target vertex of the edge
+    id: int  # Unique identifier, ex: 0, 1, etc.
+    name: Optional[str] = None  # Name of the edge, ex: 'e_0', 'e_1', etc.
+    description: Optional[str] = None  # Description of the edge
+    
+    def __post_init__(self):
         if self.name is None:
             self.name = f"e_{self.id}"
     
@@ -71,20 +77,19 @@ class Edge(BaseModel):
     def get_midpoint(self) -> Tuple[float, float]:
         return self.get_dividing_point(0.5)
 
+@dataclass(slots=True, eq=False, repr=False)
 class FrozenVariable(Edge):
     """
     A frozen variable in a graph.
     """
     pass
 
+@dataclass(slots=True, eq=False, repr=False)
 class ClusterVariable(Edge):
     """
     A cluster variable in a graph.
     """
-    num_flips: int = Field(default=0, description="Number of flips of the edge")
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+    num_flips: int = 0  # Number of flips of the edge
     
     def set_vertices(self, v1: Vertex, v2: Vertex):
         self.v1 = v1
@@ -99,36 +104,45 @@ class ClusterVariable(Edge):
     def __str__(self):
         return self.__repr__()
 
-class Polygon(BaseModel):
+@dataclass(slots=True, repr=False)
+class Polygon:
     """
     A polygon in a graph.
     """
-    vertices: List[Vertex] = Field(..., description="Vertices of the polygon")
-    edges: List[Edge] = Field(default=[], description="Edges of the polygon")
-    frozens: List[FrozenVariable] = Field(default=[], description="Frozen variables of the polygon")
-    id: int = Field(default=0, description="Unique identifier, ex: 0, 1, etc.")
-    name: str = Field(default=None, description="Name of the polygon")
-    description: Optional[str] = Field(default=None, description="Description of the polygon")
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+    vertices: List[Vertex]  # Vertices of the polygon
+    edges: List[Edge] = field(default_factory=list)  # Edges of the polygon
+    frozens: List[FrozenVariable] = field(default_factory=list)  # Frozen variables of the polygon
+    id: int = 0  # Unique identifier, ex: 0, 1, etc.
+    name: Optional[str] = None  # Name of the polygon
+    description: Optional[str] = None  # Description of the polygon
+    # Position in `vertices` by vertex id
+    _position: Dict[int, int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._position = {v.id: i for i, v in enumerate(self.vertices)}
         if self.edges == []:
             self.set_default_edges()
         self.frozens = self.edges
     
+    @classmethod
+    def from_user(cls, **data):
+        """
+        Build a polygon from user input and validate it.
+        """
+        polygon = cls(**data)
+        polygon._validate()
+        return polygon
+    
     def set_default_edges(self):
         self.edges = [FrozenVariable(v1=self.vertices[i], v2=self.vertices[(i+1)%len(self.vertices)], id=i) for i in range(len(self.vertices))]
     
-    @field_validator('edges', mode='before')
-    def check_edges(cls, edges, values):
-        vertices = values.get('vertices', [])
-        for e in edges:
-            if e.v1 not in vertices or e.v2 not in vertices:
+    def _validate(self):
+        for e in self.edges:
+            if e.v1 not in self.vertices or e.v2 not in self.vertices:
                 raise ValueError(f"Edge {e} is not a valid edge of the polygon. Both endpoints must be in the vertices list.")
-        for e in edges:
+        for e in self.edges:
             if not isinstance(e, FrozenVariable):
                 raise ValueError(f"Edge {e} is not a valid edge of the polygon. Frozen variables are allowed only.")
-        return edges
     
     def __repr__(self):
         return f"{self.name} : {self.vertices}"
@@ -136,18 +150,31 @@ class Polygon(BaseModel):
     def __str__(self):
         return self.__repr__()
 
+@dataclass(slots=True, repr=False)
 class TriangulatedPolygon(Polygon):
     """
     A triangulated polygon in a graph.
     """
-    frozens: List[FrozenVariable] = Field(default=[], description="Frozen variables of the polygon")
-    clusters: List[ClusterVariable] = Field(default=[], description="Cluster variables of the polygon")
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+    clusters: List[ClusterVariable] = field(default_factory=list)  # Cluster variables of the polygon
+    
+    # Endpoint positions in `vertices` of clusters, kept in sync with the list above
+    cluster_p: np.ndarray = field(init=False, repr=False, compare=False)
+    cluster_q: np.ndarray = field(init=False, repr=False, compare=False)
+    # Endpoint coordinates of clusters as rows of (x1, y1, x2, y2)
+    cluster_coords: np.ndarray = field(init=False, repr=False, compare=False)
+    # Canonical endpoint id pairs for O(1) membership tests, and the index of each cluster pair
+    _frozen_set: Set[Tuple[int, int]] = field(init=False, repr=False, compare=False)
+    _cluster_set: Set[Tuple[int, int]] = field(init=False, repr=False, compare=False)
+    _cluster_idx: Dict[Tuple[int, int], int] = field(init=False, repr=False, compare=False)
+    # Bit k of _adj_mask[i] is set when the i-th and k-th vertices are joined by a frozen or a cluster
+    _adj_mask: List[int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        Polygon.__post_init__(self)
         if self.clusters == []:
             self.set_default_clusters()
         self.frozens = self.edges
+        self.sync_edge_arrays()
     
     def set_default_clusters(self):
         self.clusters = [
@@ -157,38 +184,91 @@ class TriangulatedPolygon(Polygon):
                 id=i-1, 
                 name=str(i-1)
             ) for i in range(2, len(self.vertices)-1)]
+    
+    def sync_edge_arrays(self):
+        """
+        Rebuild the endpoint arrays and lookup sets after `frozens` or `clusters` is assigned or modified directly.
+        `cluster_coords` is a snapshot of the vertex coordinates, so this must also be called after a vertex moves.
+        """
+        dtype = index_dtype(len(self.vertices))
+        self.cluster_p = np.array([self._position[e.v1.id] for e in self.clusters], dtype=dtype)
+        self.cluster_q = np.array([self._position[e.v2.id] for e in self.clusters], dtype=dtype)
+        self.cluster_coords = np.array(
+            [(e.v1.x, e.v1.y, e.v2.x, e.v2.y) for e in self.clusters], dtype=np.float64).reshape(-1, 4)
+        self._frozen_set = {canonical_edge(e.v1.id, e.v2.id) for e in self.frozens}
+        self._cluster_idx = {canonical_edge(e.v1.id, e.v2.id): i for i, e in enumerate(self.clusters)}
+        self._cluster_set = set(self._cluster_idx)
+        self._adj_mask = [0] * len(self.vertices)
+        for e in self.frozens + self.clusters:
+            p, q = self._position[e.v1.id], self._position[e.v2.id]
+            self._adj_mask[p] |= 1 << q
+            self._adj_mask[q] |= 1 << p
+    
+    def is_in_frozens(self, v1: Vertex, v2: Vertex):
+        return canonical_edge(v1.id, v2.id) in self._frozen_set
+    
+    def is_in_clusters(self, v1: Vertex, v2: Vertex):
+        return canonical_edge(v1.id, v2.id) in self._cluster_set
+
+    def get_cluster_index(self, v1: Vertex, v2: Vertex) -> Optional[int]:
+        return self._cluster_idx.get(canonical_edge(v1.id, v2.id))
 
     def is_connected(self, v1: Vertex, v2: Vertex):
-        return any([{v1, v2} == {e.v1, e.v2} for e in self.clusters + self.frozens])
+        return self.is_in_clusters(v1, v2) or self.is_in_frozens(v1, v2)
     
     def get_triangles(self, cluster: ClusterVariable):
-        v1, v2 = cluster.v1, cluster.v2
+        common = self._adj_mask[self._position[cluster.v1.id]] & self._adj_mask[self._position[cluster.v2.id]]
+        return [self.vertices[k] for k in iter_bits(common)]
+    
+    def get_all_triangles(self) -> List[Tuple[Vertex, Vertex, Vertex]]:
+        """
+        Get all triangles of the triangulation, each ordered by position in `vertices`.
+        """
         triangles = []
-        for v in self.vertices:
-            if self.is_connected(v, v1) and self.is_connected(v, v2):
-                triangles.append(v)
+        for e in self.frozens + self.clusters:
+            a, b = sorted((self._position[e.v1.id], self._position[e.v2.id]))
+            common = self._adj_mask[a] & self._adj_mask[b]
+            for c in iter_bits(common >> (b + 1)):
+                triangles.append((self.vertices[a], self.vertices[b], self.vertices[b + 1 + c]))
         return triangles
     
     def flip(self, cluster: ClusterVariable):
         v3, v4 = self.get_triangles(cluster)
+        a, b = cluster.v1.id, cluster.v2.id
         cluster.set_vertices(v3, v4)
         cluster.num_flips += 1
+        
+        old_pair, new_pair = canonical_edge(a, b), canonical_edge(v3.id, v4.id)
+        i = self._cluster_idx.pop(old_pair)
+        self._cluster_idx[new_pair] = i
+        self._cluster_set.discard(old_pair)
+        self._cluster_set.add(new_pair)
+        pa, pb = self._position[a], self._position[b]
+        pc, pd = self._position[v3.id], self._position[v4.id]
+        self._adj_mask[pa] &= ~(1 << pb)
+        self._adj_mask[pb] &= ~(1 << pa)
+        self._adj_mask[pc] |= 1 << pd
+        self._adj_mask[pd] |= 1 << pc
+        self.cluster_p[i] = pc
+        self.cluster_q[i] = pd
+        self.cluster_coords[i] = (v3.x, v3.y, v4.x, v4.y)
 
-class SingleLamination(BaseModel):
+@dataclass(slots=True, repr=False)
+class SingleLamination:
     """
     A single lamination in a graph.
     """
-    start: FrozenVariable = Field(..., description="Start of the lamination")
-    end: FrozenVariable = Field(..., description="End of the lamination")
-    id: int = Field(default=0, description="Unique identifier, ex: 0, 1, etc.")
-    name: str = Field(default=None, description="Name of the lamination")
-    description: Optional[str] = Field(default=None, description="Description of the lamination")
+    start: FrozenVariable  # Start of the lamination
+    end: FrozenVariable  # End of the lamination
+    id: int = 0  # Unique identifier, ex: 0, 1, etc.
+    name: Optional[str] = None  # Name of the lamination
+    description: Optional[str] = None  # Description of the lamination
     
-    starting_point: Tuple[float, float] = Field(default=None, description="Starting point of the lamination")
-    ending_point: Tuple[float, float] = Field(default=None, description="Ending point of the lamination")
+    starting_point: Optional[Tuple[float, float]] = None  # Starting point of the lamination
+    ending_point: Optional[Tuple[float, float]] = None  # Ending point of the lamination
+    _midpoint: Optional[Tuple[float, float]] = field(default=None, init=False, repr=False, compare=False)
     
-    def __init__(self, **data):
-        super().__init__(**data)
+    def __post_init__(self):
         if self.name is None:
             self.name = f"arc_{self.id}"
     
@@ -200,83 +280,292 @@ class SingleLamination(BaseModel):
     
     def set_starting_point(self, x: float, y: float):
         self.starting_point = (x, y)
+        self._midpoint = None
     
     def set_ending_point(self, x: float, y: float):
         self.ending_point = (x, y)
+        self._midpoint = None
     
     def get_midpoint(self) -> Tuple[float, float]:
+        if self._midpoint is not None:
+            return self._midpoint
         if self.starting_point is None:
             self.starting_point = self.start.get_midpoint()
         if self.ending_point is None:
             self.ending_point = self.end.get_midpoint()
         
-        return ((self.starting_point[0] + self.ending_point[0]) / 2, (self.starting_point[1] + self.ending_point[1]) / 2)
+        self._midpoint = ((self.starting_point[0] + self.ending_point[0]) / 2, (self.starting_point[1] + self.ending_point[1]) / 2)
+        return self._midpoint
 
-class Lamination(BaseModel):
-    arcs: List[SingleLamination] = Field(default=[], description="Arcs of the lamination")
-    id: int = Field(default=0, description="Unique identifier, ex: 0, 1, etc.")
-    name: str = Field(default=None, description="Name of the lamination")
-    description: Optional[str] = Field(default=None, description="Description of the lamination")
-    
-    def __init__(self, **data):
-        super().__init__(**data)
+@dataclass(slots=True)
+class Lamination:
+    arcs: List[SingleLamination] = field(default_factory=list)  # Arcs of the lamination
+    id: int = 0  # Unique identifier, ex: 0, 1, etc.
+    name: Optional[str] = None  # Name of the lamination
+    description: Optional[str] = None  # Description of the lamination
+    
+    def __post_init__(self):
         if self.name is None:
             self.name = f"lam_{self.id}"
     
     def __len__(self):
         return len(self.arcs)
 
-class Shear(BaseModel):
+@dataclass(slots=True)
+class Shear:
     """
     A shear in a graph.
     """
     pass
 
-class Arrow(BaseModel):
+@dataclass(slots=True)
+class Arrow:
     """
     An arrow in a graph.
     """
     pass
 
+@dataclass(slots=True, repr=False)
 class Quiver(TriangulatedPolygon):
     """
     A quiver in a graph.
     """
-    laminations: List[Lamination] = Field(default=[], description="Laminations of the quiver")
-    arrows: List[Arrow] = Field(default=[], description="Arrows of the quiver")
+    laminations: List[Lamination] = field(default_factory=list)  # Laminations of the quiver
+    arrows: List[Arrow] = field(default_factory=list)  # Arrows of the quiver
+    
+    # Exchange matrix of the clusters, built lazily and replaced by its mutation on flip
+    _B: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # Pairwise intersection mask of the clusters, built lazily and dropped by flip
+    _intersections: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # Vertex positions (a, b, c, d) of the quadrilateral around each cluster, built lazily and updated by flip
+    _quads: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
     
     def __repr__(self):
         return f"{self.name} : {self.vertices}"
     
     def __str__(self):
         return self.__repr__()
+    
+    def plot(self, **kwargs):
+        """
+        Plot the quiver, see Plotter.plot_quiver for the options.
+        """
+        from .plot import Plotter
+        return Plotter().plot_quiver(self, **kwargs)
+    
+    def sync_edge_arrays(self):
+        TriangulatedPolygon.sync_edge_arrays(self)
+        self._B = None
+        self._intersections = None
+        self._quads = None
+    
+    def flip(self, cluster: ClusterVariable):
+        k = self.get_cluster_index(cluster.v1, cluster.v2)
+        TriangulatedPolygon.flip(self, cluster)
+        if self._B is not None:
+            self._B = mutate_exchange_matrix(self._B, k)
+        self._intersections = None
+        if self._quads is not None:
+            self._update_quadrilaterals(k)
+    
+    def get_intersection_matrix(self) -> np.ndarray:
+        """
+        Get a boolean matrix whose entry (i, j) tells if the i-th and j-th clusters intersect,
+        as decided by get_intersection.
+        """
+        if self._intersections is None:
+            x1, y1, x2, y2 = (c[:, None] for c in self.cluster_coords.T)
+            x3, y3, x4, y4 = (c[None, :] for c in self.cluster_coords.T)
+            den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / den
+                u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den
+            self._intersections = (den != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        return self._intersections
 
     def get_crossing_clusters(self, target: ClusterVariable):
-        crossing_clusters = []
-        for cluster in self.clusters:
-            if cluster == target:
-                continue
-            intersection = get_intersection(cluster, target)
-            if intersection:
-                crossing_clusters.append((cluster, intersection))
+        cx1, cy1, cx2, cy2 = self.cluster_coords.T
+        x3, y3 = target.v1.x, target.v1.y
+        x4, y4 = target.v2.x, target.v2.y
+        
+        # Same test as get_intersection, evaluated for all clusters at once
+        den = (cx1 - cx2) * (y3 - y4) - (cy1 - cy2) * (x3 - x4)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = ((cx1 - x3) * (y3 - y4) - (cy1 - y3) * (x3 - x4)) / den
+            u = -((cx1 - cx2) * (cy1 - y3) - (cy1 - cy2) * (cx1 - x3)) / den
+        crossing = np.flatnonzero((den != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1))
+        
+        # Sort crossing clusters based on distance from target.v1, which grows with u.
+        # Clusters sharing an endpoint with target meet it exactly at u = 0 or u = 1.
+        u = u[crossing]
+        p, q = self.cluster_p[crossing], self.cluster_q[crossing]
+        t1, t2 = self._position.get(target.v1.id, -1), self._position.get(target.v2.id, -1)
+        u[(p == t1) | (q == t1)] = 0
+        u[(p == t2) | (q == t2)] = 1
+        order = np.argsort(u, kind="stable")
+        
+        crossing_clusters = [self.clusters[i] for i in crossing[order].tolist()]
+        return [cluster for cluster in crossing_clusters if cluster != target]
+    
+    def _get_relative_positions(self, arc: SingleLamination) -> Tuple[np.ndarray, int]:
+        """
+        Get the positions of the vertices counted from the start of the arc, indexed by position.
+        Vertices with relative position below the returned bound lie on one side of the arc.
+        """
+        n = len(self.vertices)
+        position = self._position
         
-        # Sort crossing clusters based on distance from target.v1
-        crossing_clusters.sort(key=lambda x: distance(target.v1, x[1]))
+        def after(e: FrozenVariable) -> int:
+            # Position of the endpoint of a boundary edge that comes later in the cyclic order
+            p, q = position[e.v1.id], position[e.v2.id]
+            return q if (p + 1) % n == q else p
         
-        return [cluster for cluster, _ in crossing_clusters]
+        s, e = after(arc.start), after(arc.end)
+        relative = ((np.arange(n) - s) % n).astype(index_dtype(n))
+        return relative, (e - s) % n
+    
+    def _get_quadrilaterals(self) -> np.ndarray:
+        """
+        Get the quadrilateral around each cluster (a, b) as vertex positions (a, b, c, d),
+        where c is on the left of a -> b and d on the right.
+        """
+        if self._quads is None:
+            position = self._position
+            quads = []
+            for cluster in self.clusters:
+                a, b = cluster.v1, cluster.v2
+                c, d = self.get_triangles(cluster)
+                if not is_left(a, b, c):
+                    c, d = d, c
+                quads.append((position[a.id], position[b.id], position[c.id], position[d.id]))
+            self._quads = np.array(quads, dtype=index_dtype(len(self.vertices))).reshape(-1, 4)
+        return self._quads
+    
+    def _update_quadrilaterals(self, k: int):
+        """
+        Update the quadrilaterals changed by flipping the k-th cluster.
+        """
+        a, b, c, d = self._quads[k].tolist()
+        # A side of the old quadrilateral that is a cluster now faces the other end of the new diagonal
+        for x, y, old, new in ((a, c, b, d), (c, b, a, d), (b, d, a, c), (d, a, b, c)):
+            i = self._cluster_idx.get(canonical_edge(self.vertices[x].id, self.vertices[y].id))
+            if i is not None:
+                row = self._quads[i]
+                row[2 if row[2] == old else 3] = new
+        
+        p, q = self.cluster_p[k], self.cluster_q[k]
+        if is_left(self.vertices[p], self.vertices[q], self.vertices[a]):
+            self._quads[k] = (p, q, a, b)
+        else:
+            self._quads[k] = (p, q, b, a)
+    
+    def get_shear_coordinates(self, arc: SingleLamination) -> np.ndarray:
+        """
+        Get the shear coordinates of a lamination arc with respect to each cluster.
+        """
+        relative, bound = self._get_relative_positions(arc)
+        r = relative[self._get_quadrilaterals()]
+        return _shear(r[:, 0], r[:, 1], r[:, 2], r[:, 3], bound)
+    
+    def get_exchange_matrix(self) -> pd.DataFrame:
+        """
+        Get the exchange matrix of the quiver, followed by one row of shear coordinates per lamination.
+        Entry (i, j) is 1 when cluster j follows cluster i clockwise in a triangle, -1 when counterclockwise.
+        """
+        B, row_labels, col_labels = self._get_exchange_matrix_array()
+        return pd.DataFrame(B, index=list(row_labels), columns=list(col_labels))
+    
+    def _get_exchange_matrix_array(self) -> Tuple[np.ndarray, Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Same as get_exchange_matrix, as a bare array with its row and column labels.
+        """
+        if self._B is None:
+            self._B = self._get_cluster_exchange_matrix()
+        n = len(self.clusters)
+        B = np.zeros((n + len(self.laminations), n), dtype=np.int8)
+        B[:n] = self._B
+        for r, lamination in enumerate(self.laminations, start=n):
+            for arc in lamination.arcs:
+                B[r] += self.get_shear_coordinates(arc)
+        
+        varnames = tuple(c.get_varname() for c in self.clusters)
+        return B, varnames + tuple(lam.name for lam in self.laminations), varnames
+    
+    def _get_cluster_exchange_matrix(self) -> np.ndarray:
+        n = len(self.clusters)
+        B = np.zeros((n, n), dtype=np.int8)
+        
+        triangles = self.get_all_triangles()
+        if triangles:
+            positions = np.array(
+                [[self._position[v.id] for v in t] for t in triangles], dtype=self.cluster_p.dtype)
+            pts = np.array([[v.to_tuple() for v in t] for t in triangles], dtype=np.float64)
+            d1, d2 = pts[:, 1] - pts[:, 0], pts[:, 2] - pts[:, 0]
+            cw = d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0] < 0
+            positions[cw] = positions[cw][:, ::-1]  # Make every triangle counterclockwise
+            
+            # Side k joins the k-th and (k+1)-th vertex; frozen sides are marked with -1
+            ids = [[self.vertices[p].id for p in t] for t in positions.tolist()]
+            sides = np.array([
+                [self._cluster_idx.get(canonical_edge(t[k], t[(k + 1) % 3]), -1) for k in range(3)]
+                for t in ids], dtype=index_dtype(n))
+            for k in range(3):
+                i, j = sides[:, k], sides[:, k - 1]
+                mask = (i >= 0) & (j >= 0)
+                np.add.at(B, (i[mask], j[mask]), 1)
+                np.add.at(B, (j[mask], i[mask]), -1)
+        return B
 
 
 
+def is_left(a: Vertex, b: Vertex, c: Vertex) -> bool:
+    # Check if c is on the left of a -> b
+    return (b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x) >= 0
+
+def canonical_edge(a: int, b: int) -> Tuple[int, int]:
+    # Endpoints in (min, max) order, so each edge has a single key in either orientation
+    return (a, b) if a <= b else (b, a)
+
+def iter_bits(x: int) -> Iterable[int]:
+    # Indices of the set bits of x, from the lowest
+    while x:
+        b = x & -x
+        yield b.bit_length() - 1
+        x ^= b
+
+def index_dtype(n: int) -> type:
+    # np.int16 when the indices 0..n-1 fit in it, which covers any realistic polygon, else np.int32
+    return np.int16 if n <= np.iinfo(np.int16).max + 1 else np.int32
+
+def mutate_exchange_matrix(B: np.ndarray, k: int) -> np.ndarray:
+    """
+    Mutate the exchange matrix B in direction k.
+    """
+    col, row = B[:, k:k+1], B[k:k+1, :]
+    mutated = B + (np.abs(col) * row + col * np.abs(row)) // 2
+    mutated[k, :] = -B[k, :]
+    mutated[:, k] = -B[:, k]
+    return mutated
+
+def _dist_vv(v1: Vertex, v2: Vertex) -> float:
+    dx, dy = v1.x - v2.x, v1.y - v2.y
+    return (dx * dx + dy * dy)**0.5
+
+def _dist_vt(v: Vertex, pt: Point2D) -> float:
+    dx, dy = v.x - pt[0], v.y - pt[1]
+    return (dx * dx + dy * dy)**0.5
+
+def _dist_tt(p1: Point2D, p2: Point2D) -> float:
+    dx, dy = p1[0] - p2[0], p1[1] - p2[1]
+    return (dx * dx + dy * dy)**0.5
+
 def distance(v1: Union[Vertex, Point2D], v2: Union[Vertex, Point2D]):
+    # Hot loops should call _dist_vv, _dist_vt or _dist_tt directly and skip this dispatch
     if isinstance(v1, Vertex):
-        x1, y1 = v1.x, v1.y
-    else:
-        x1, y1 = v1
+        return _dist_vv(v1, v2) if isinstance(v2, Vertex) else _dist_vt(v1, v2)
     if isinstance(v2, Vertex):
-        x2, y2 = v2.x, v2.y
-    else:
-        x2, y2 = v2
-    return ((x1 - x2)**2 + (y1 - y2)**2)**0.5
+        return _dist_vt(v2, v1)
+    return _dist_tt(v1, v2)
 
 def get_intersection(e1: Edge, e2: Edge):
     # Check if line segments intersect
@@ -284,18 +573,20 @@ def get_intersection(e1: Edge, e2: Edge):
     x2, y2 = e1.v2.x, e1.v2.y
     x3, y3 = e2.v1.x, e2.v1.y
     x4, y4 = e2.v2.x, e2.v2.y
-    
+    if HAS_NUMBA:
+        found, x, y = _segseg_intersect(x1, y1, x2, y2, x3, y3, x4, y4)
+        return (x, y) if found else None
+
+    # Without numba the kernel is plain python, so skip the extra call
     den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
     if den == 0:
         return None  # Lines are parallel
-    
     t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / den
     u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den
-    
     if 0 <= t <= 1 and 0 <= u <= 1:
         # Intersection point
         x = x1 + t * (x2 - x1)
         y = y1 + t * (y2 - y1)
         return (x, y)
-    
+
     return None
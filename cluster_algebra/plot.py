@@ -0,0 +1,69 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from typing import Dict, List, Optional
+
+from .model import Edge, Quiver
+
+
+class Plotter:
+    """
+    A plotter for quivers.
+    """
+    def __init__(self, ax: Optional[plt.Axes] = None, label_size: float = 300):
+        self.ax = ax
+        self.label_size = label_size
+
+    def get_segments(self, xy: np.ndarray, position: Dict[int, int], edges: List[Edge]) -> np.ndarray:
+        """
+        Get the endpoints of the edges as an array of shape (len(edges), 2, 2).
+        """
+        p = np.array([position[e.v1.id] for e in edges], dtype=np.intp)
+        q = np.array([position[e.v2.id] for e in edges], dtype=np.intp)
+        return np.stack([xy[p], xy[q]], axis=1)
+
+    def plot_labels(self, ax: plt.Axes, points: np.ndarray, labels: List[str], color: str):
+        ax.scatter(points[:, 0], points[:, 1], s=self.label_size, c="white", edgecolors=color, zorder=3)
+        for (x, y), label in zip(points.tolist(), labels):
+            ax.text(x, y, label, color=color, ha="center", va="center", zorder=4)
+
+    def plot_quiver(
+        self,
+        quiver: Quiver,
+        show_vertices: bool = True,
+        show_frozens: bool = True,
+        show_clusters: bool = True,
+        show_laminations: bool = True,
+    ) -> plt.Axes:
+        """
+        Plot the polygon, its cluster variables and laminations of the quiver.
+        show_vertices, show_frozens and show_clusters toggle the labels of those items,
+        show_laminations toggles the lamination arcs themselves.
+        """
+        ax = self.ax if self.ax is not None else plt.figure().gca()
+
+        xy = np.array([v.to_tuple() for v in quiver.vertices], dtype=np.float64).reshape(-1, 2)
+        frozens = self.get_segments(xy, quiver._position, quiver.frozens)
+        clusters = self.get_segments(xy, quiver._position, quiver.clusters)
+        ax.add_collection(LineCollection(frozens, colors="black"))
+        ax.add_collection(LineCollection(clusters, colors="tab:blue"))
+
+        if show_vertices:
+            ax.scatter(xy[:, 0], xy[:, 1], c="black", zorder=3)
+            for point, v in zip(xy.tolist(), quiver.vertices):
+                ax.annotate(v.name, point, textcoords="offset points", xytext=(6, 6))
+        if show_frozens and len(frozens):
+            self.plot_labels(ax, frozens.mean(axis=1), [e.name for e in quiver.frozens], "black")
+        if show_clusters and len(clusters):
+            self.plot_labels(ax, clusters.mean(axis=1), [f"${c.get_varname()}$" for c in quiver.clusters], "tab:blue")
+        if show_laminations:
+            arcs = [arc for lamination in quiver.laminations for arc in lamination.arcs]
+            for arc in arcs:
+                arc.get_midpoint()  # Sets the default starting and ending points
+            segments = np.array([(arc.starting_point, arc.ending_point) for arc in arcs], dtype=np.float64)
+            ax.add_collection(LineCollection(segments.reshape(-1, 2, 2), colors="tab:red"))
+
+        ax.set_aspect("equal")
+        ax.autoscale_view()
+        ax.axis("off")
+        return ax
@@ -10,5 +10,6 @@ setup(
     long_description_content_type="text/markdown",
     packages=find_packages(),  # Automatically find and include your package
     install_requires=[],  # Add any dependencies here
-    python_requires=">=3.7",  # Specify compatible Python versions
+    extras_require={"numba": ["numba"]},  # Optional, compiles the geometry kernels
+    python_requires=">=3.10",  # Specify compatible Python versions
 )
\ No newline at end of file
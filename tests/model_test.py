@@ -1,5 +1,7 @@
+import math
 import pytest
-from cluster_algebra.model import Vertex, Edge, FrozenVariable, ClusterVariable, Polygon, TriangulatedPolygon, SingleLamination, Lamination, Quiver, distance, get_intersection
+import numpy as np
+from cluster_algebra.model import Vertex, Edge, FrozenVariable, ClusterVariable, Polygon, TriangulatedPolygon, SingleLamination, Lamination, Quiver, distance, get_intersection, canonical_edge, iter_bits, mutate_exchange_matrix
 
 def test_vertex():
     v = Vertex(x=1.0, y=2.0, id=0)
@@ -8,6 +10,8 @@ def test_vertex():
     assert v.id == 0
     assert v.name == "v_0"
     assert v.to_tuple() == (1.0, 2.0)
+    assert v == Vertex(x=3.0, y=4.0, id=0)
+    assert {v, Vertex(x=3.0, y=4.0, id=0)} == {v}
 
 def test_edge():
     v1 = Vertex(x=0.0, y=0.0, id=0)
@@ -43,6 +47,18 @@ def test_polygon():
     assert len(p.edges) == 3
     assert all(isinstance(e, Edge) for e in p.edges)
     assert all(isinstance(e, FrozenVariable) for e in p.frozens)
+
+def test_polygon_from_user():
+    v1 = Vertex(x=0.0, y=0.0, id=0)
+    v2 = Vertex(x=1.0, y=0.0, id=1)
+    v3 = Vertex(x=0.5, y=1.0, id=2)
+    v4 = Vertex(x=2.0, y=2.0, id=3)
+    p = Polygon.from_user(vertices=[v1, v2, v3], id=0)
+    assert len(p.edges) == 3
+    with pytest.raises(ValueError):
+        Polygon.from_user(vertices=[v1, v2, v3], edges=[FrozenVariable(v1=v1, v2=v4, id=0)])
+    with pytest.raises(ValueError):
+        Polygon.from_user(vertices=[v1, v2, v3], edges=[Edge(v1=v1, v2=v2, id=0)])
     
 def test_triangulated_polygon():
     v1 = Vertex(x=0.0, y=0.0, id=0)
@@ -55,6 +71,24 @@ def test_triangulated_polygon():
     assert tp.is_connected(v1, v4)
     assert tp.get_triangles(tp.clusters[0]) == [v2, v4]
 
+def test_triangulated_polygon_flip():
+    v1 = Vertex(x=0.0, y=0.0, id=0)
+    v2 = Vertex(x=1.0, y=0.0, id=1)
+    v3 = Vertex(x=1.0, y=1.0, id=2)
+    v4 = Vertex(x=0.0, y=1.0, id=3)
+    tp = TriangulatedPolygon(vertices=[v1, v2, v3, v4], id=0)
+    assert tp.is_in_clusters(v3, v1)
+    assert tp.is_in_frozens(v4, v1)
+    assert not tp.is_connected(v2, v4)
+    tp.flip(tp.clusters[0])
+    assert tp.clusters[0].num_flips == 1
+    assert tp.is_in_clusters(v2, v4)
+    assert not tp.is_connected(v1, v3)
+    assert tp.get_cluster_index(v4, v2) == 0
+    assert tp.get_cluster_index(v1, v3) is None
+    assert tp.get_triangles(tp.clusters[0]) == [v1, v3]
+    assert tp.get_all_triangles() == [(v1, v2, v4), (v2, v3, v4)]
+
 def test_single_lamination():
     v1 = Vertex(x=0.0, y=0.0, id=0)
     v2 = Vertex(x=1.0, y=0.0, id=1)
@@ -65,6 +99,10 @@ def test_single_lamination():
     assert sl.start == e1
     assert sl.end == e2
     assert sl.name == "arc_0"
+    assert sl.get_midpoint() == (0.625, 0.25)
+    assert sl.get_midpoint() is sl.get_midpoint()
+    sl.set_ending_point(1.0, 1.0)
+    assert sl.get_midpoint() == (0.75, 0.5)
 
 def test_lamination():
     v1 = Vertex(x=0.0, y=0.0, id=0)
@@ -86,14 +124,155 @@ def test_quiver():
     q = Quiver(vertices=[v1, v2, v3, v4], id=0)
     assert len(q.clusters) == 1
     assert len(q.frozens) == 4
+    assert q.cluster_p.dtype == np.int16
+    assert q.get_exchange_matrix().values.dtype == np.int8
+
+def test_quiver_large_ids():
+    vertices = [Vertex(x=math.cos(i), y=math.sin(i), id=2**40 + i) for i in range(6)]
+    q = Quiver(vertices=vertices, id=0)
+    assert q.cluster_p.dtype == np.int16
+    assert q.get_exchange_matrix().shape == (3, 3)
+    target = ClusterVariable(v1=vertices[1], v2=vertices[3], id=99)
+    assert q.get_crossing_clusters(target) == [q.clusters[0]]
+    q.flip(q.clusters[1])
+    assert q.is_in_clusters(vertices[2], vertices[4])
+
+def test_get_crossing_clusters():
+    v1 = Vertex(x=0.0, y=0.0, id=0)
+    v2 = Vertex(x=1.0, y=0.0, id=1)
+    v3 = Vertex(x=1.0, y=1.0, id=2)
+    v4 = Vertex(x=0.0, y=1.0, id=3)
+    q = Quiver(vertices=[v1, v2, v3, v4], id=0)
+    target = ClusterVariable(v1=v2, v2=v4, id=99)
+    assert q.get_crossing_clusters(target) == [q.clusters[0]]
+    assert q.get_crossing_clusters(q.clusters[0]) == []
+
+def test_get_crossing_clusters_after_moving_vertex():
+    v1 = Vertex(x=0.0, y=0.0, id=0)
+    v2 = Vertex(x=1.0, y=0.0, id=1)
+    v3 = Vertex(x=1.0, y=1.0, id=2)
+    v4 = Vertex(x=0.0, y=1.0, id=3)
+    q = Quiver(vertices=[v1, v2, v3, v4], id=0)
+    target = ClusterVariable(v1=v2, v2=v4, id=99)
+    v1.x, v1.y = 2.0, 2.0
+    q.sync_edge_arrays()
+    assert q.get_crossing_clusters(target) == []
+    v1.x, v1.y = -1.0, -1.0
+    q.sync_edge_arrays()
+    assert q.get_crossing_clusters(target) == [q.clusters[0]]
+
+def make_regular_quiver(n):
+    vertices = [Vertex(x=math.cos(2 * math.pi * i / n), y=math.sin(2 * math.pi * i / n), id=i) for i in range(n)]
+    return Quiver(vertices=vertices, id=0)
+
+def mutate(B, k):
+    return [
+        [-B[i][j] if k in (i, j) else B[i][j] + (abs(B[i][k]) * B[k][j] + B[i][k] * abs(B[k][j])) // 2 for j in range(len(B[0]))]
+        for i in range(len(B))]
+
+def test_get_exchange_matrix():
+    q = make_regular_quiver(8)
+    q.laminations = [Lamination(arcs=[SingleLamination(start=q.frozens[0], end=q.frozens[3])])]
+    B = q.get_exchange_matrix()
+    assert list(B.columns) == ["x_{1}", "x_{2}", "x_{3}", "x_{4}", "x_{5}"]
+    assert list(B.index) == ["x_{1}", "x_{2}", "x_{3}", "x_{4}", "x_{5}", "lam_0"]
+    assert B.values.tolist() == [
+        [0, 1, 0, 0, 0],
+        [-1, 0, 1, 0, 0],
+        [0, -1, 0, 1, 0],
+        [0, 0, -1, 0, 1],
+        [0, 0, 0, -1, 0],
+        [0, -1, 0, 0, 0],
+    ]
+
+def test_get_shear_coordinates():
+    q = make_regular_quiver(8)
+    arc = SingleLamination(start=q.frozens[0], end=q.frozens[3])
+    assert q.get_shear_coordinates(arc).tolist() == [0, -1, 0, 0, 0]
+    q.flip(q.clusters[1])
+    assert q.get_shear_coordinates(arc).tolist() == [-1, 1, 0, 0, 0]
+
+def test_shear_coordinates_with_unusual_ids():
+    q = make_regular_quiver(8)
+    vertices = [Vertex(x=v.x, y=v.y, id=-1 - v.id) for v in q.vertices]
+    q_negative = Quiver(vertices=vertices, id=0)
+    vertices = [Vertex(x=v.x, y=v.y, id=700_000_000 + v.id) for v in q.vertices]
+    q_large = Quiver(vertices=vertices, id=0)
+    for quiver in (q, q_negative, q_large):
+        quiver.laminations = [Lamination(arcs=[SingleLamination(start=quiver.frozens[0], end=quiver.frozens[3])])]
+    B = q.get_exchange_matrix().values.tolist()
+    assert q_negative.get_exchange_matrix().values.tolist() == B
+    assert q_large.get_exchange_matrix().values.tolist() == B
+
+def test_flip_updates_quadrilaterals():
+    q = make_regular_quiver(9)
+    q.laminations = [Lamination(arcs=[SingleLamination(start=q.frozens[1], end=q.frozens[6])])]
+    q.get_exchange_matrix()
+    for k in [2, 3, 1, 0, 5, 2, 4, 3]:
+        q.flip(q.clusters[k])
+        quads = q._quads.copy()
+        q._quads = None
+        assert (q._get_quadrilaterals() == quads).all()
+
+def test_get_exchange_matrix_array():
+    q = make_regular_quiver(6)
+    q.laminations = [Lamination(arcs=[SingleLamination(start=q.frozens[0], end=q.frozens[3])])]
+    B, row_labels, col_labels = q._get_exchange_matrix_array()
+    assert row_labels == ("x_{1}", "x_{2}", "x_{3}", "lam_0")
+    assert col_labels == ("x_{1}", "x_{2}", "x_{3}")
+    assert B.tolist() == q.get_exchange_matrix().values.tolist()
+
+def test_exchange_matrix_follows_mutation():
+    q = make_regular_quiver(8)
+    q.laminations = [Lamination(arcs=[SingleLamination(start=q.frozens[0], end=q.frozens[3])])]
+    B = q.get_exchange_matrix().values.tolist()
+    for k in [1, 2, 0, 3, 2, 4]:
+        q.flip(q.clusters[k])
+        B = mutate(B, k)
+        assert q.get_exchange_matrix().values.tolist() == B
+
+def test_get_crossing_clusters_order():
+    q = make_regular_quiver(8)
+    v = q.vertices
+    assert [c.id for c in q.get_crossing_clusters(ClusterVariable(v1=v[2], v2=v[7], id=99))] == [1, 2, 3, 4, 5]
+    q.flip(q.clusters[2])
+    # Clusters meeting the target at v[0] come first, in list order
+    assert [c.id for c in q.get_crossing_clusters(ClusterVariable(v1=v[0], v2=v[4], id=99))] == [1, 2, 4, 5, 3]
+    assert [c.id for c in q.get_crossing_clusters(ClusterVariable(v1=v[4], v2=v[0], id=99))] == [3, 1, 2, 4, 5]
+
+def test_get_intersection_matrix():
+    q = make_regular_quiver(6)
+    M = q.get_intersection_matrix()
+    assert M.tolist() == [[get_intersection(a, b) is not None for b in q.clusters] for a in q.clusters]
+    assert q.get_intersection_matrix() is M
+    q.flip(q.clusters[1])
+    M = q.get_intersection_matrix()
+    assert M.tolist() == [[False, True, True], [True, False, True], [True, True, False]]
+
+def test_mutate_exchange_matrix():
+    B = np.array([[0, 1, 0], [-1, 0, 1], [0, -1, 0], [1, 0, -1]], dtype=np.int8)
+    assert mutate_exchange_matrix(B, 1).tolist() == mutate(B.tolist(), 1)
+    assert B.tolist() == [[0, 1, 0], [-1, 0, 1], [0, -1, 0], [1, 0, -1]]
+
+def test_canonical_edge():
+    assert canonical_edge(3, 1) == canonical_edge(1, 3) == (1, 3)
+
+def test_iter_bits():
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+    assert list(iter_bits(1 << 70)) == [70]
 
 def test_distance():
     v1 = Vertex(x=0.0, y=0.0, id=0)
     v2 = Vertex(x=3.0, y=4.0, id=1)
     assert distance(v1, v2) == 5.0
     assert distance((0.0, 0.0), (3.0, 4.0)) == 5.0
+    assert distance(v1, (3.0, 4.0)) == 5.0
+    assert distance((0.0, 0.0), v2) == 5.0
 
-def test_get_intersection():
+@pytest.mark.parametrize("has_numba", [True, False])
+def test_get_intersection(monkeypatch, has_numba):
+    monkeypatch.setattr("cluster_algebra.model.HAS_NUMBA", has_numba)
     e1 = Edge(v1=Vertex(x=0.0, y=0.0, id=0), v2=Vertex(x=2.0, y=2.0, id=1), id=0)
     e2 = Edge(v1=Vertex(x=0.0, y=2.0, id=2), v2=Vertex(x=2.0, y=0.0, id=3), id=1)
     intersection = get_intersection(e1, e2)
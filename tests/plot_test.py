@@ -0,0 +1,39 @@
+import math
+import matplotlib
+matplotlib.use("Agg")
+import pytest
+from cluster_algebra.model import Vertex, SingleLamination, Lamination, Quiver
+from cluster_algebra.plot import Plotter
+
+def make_quiver():
+    vertices = [Vertex(x=math.cos(2 * math.pi * i / 6), y=math.sin(2 * math.pi * i / 6), id=i) for i in range(6)]
+    q = Quiver(vertices=vertices, id=0)
+    q.laminations = [Lamination(arcs=[SingleLamination(start=q.frozens[0], end=q.frozens[3])])]
+    return q
+
+def test_plot_quiver():
+    q = make_quiver()
+    ax = Plotter().plot_quiver(q)
+    frozens, clusters, laminations = ax.collections[0], ax.collections[1], ax.collections[-1]
+    assert len(frozens.get_segments()) == 6
+    assert len(clusters.get_segments()) == 3
+    assert len(laminations.get_segments()) == 1
+    assert [t.get_text() for t in ax.texts if t.get_text().startswith("$x")] == ["$x_{1}$", "$x_{2}$", "$x_{3}$"]
+
+def test_plot_quiver_plain_frozen_names():
+    vertices = [Vertex(x=math.cos(2 * math.pi * i / 12), y=math.sin(2 * math.pi * i / 12), id=i) for i in range(12)]
+    q = Quiver(vertices=vertices, id=0)
+    q.frozens[0].name = "e^^3 edge"
+    ax = Plotter().plot_quiver(q)
+    ax.figure.canvas.draw()
+    texts = [t.get_text() for t in ax.texts]
+    assert "e^^3 edge" in texts
+    assert "e_10" in texts
+
+def test_plot_quiver_without_labels():
+    q = make_quiver()
+    ax = q.plot(show_vertices=False, show_frozens=False, show_clusters=False)
+    assert len(ax.texts) == 0
+
+if __name__ == "__main__":
+    pytest.main()